@@ -1,7 +1,13 @@
 #database.py
+import functools
+import io
 import os
+import threading
+from itertools import islice
 from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, String, inspect
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from cachetools import TTLCache
 import pandas as pd
 
 # Database configuration with environment-specific defaults
@@ -17,25 +23,115 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 TABLE_NAME = "uploaded_data"
+INSERT_CHUNKSIZE = int(os.getenv("INSERT_CHUNKSIZE", "10000"))
+# Bulk-load strategy on PostgreSQL: "copy" (COPY FROM STDIN, default) or
+# "values" (psycopg2 execute_values multi-VALUES inserts)
+PG_BULK_METHOD = os.getenv("PG_BULK_METHOD", "copy").lower()
+# Comma-separated list of columns to index after upload; defaults to all
+# CSV columns since any of them can be used as a /records/ filter
+INDEX_COLUMNS = [c.strip() for c in os.getenv("INDEX_COLUMNS", "").split(",") if c.strip()]
 
 # SQLAlchemy setup
-engine = create_engine(DATABASE_URL)
+# Fast Execution Helpers: rewrite executemany parameter sets into a single
+# multi-VALUES statement instead of one round-trip per row.
+# Pool is sized for concurrent FastAPI traffic so endpoints reuse warm
+# connections instead of paying the TCP/auth handshake per request.
+engine = create_engine(
+    DATABASE_URL,
+    executemany_mode="values_plus_batch",
+    executemany_batch_page_size=500,
+    insertmanyvalues_page_size=10_000,
+    pool_size=20,
+    max_overflow=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_use_lifo=True,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Cached answer to "does the uploaded_data table exist?" — stable between
+# uploads, so CRUD calls should not re-query the catalog every time
+_table_exists = None
+
+# Columns with a materialized count view (mv_count_<column>) behind them
+_mat_views = set()
+
+# Table object of the current schema, kept so insert paths never re-reflect
+_current_table = None
+
+# Columns of the current table, tracked so identifiers callers hand us are
+# validated before being interpolated into SQL; None means unknown
+_allowed_columns = None
+
+def _quote(identifier):
+    """Quote an identifier through the active dialect's preparer
+
+    CSV headers are not guaranteed to be bare SQL identifiers — uppercase
+    letters, spaces, and reserved words all need quoting before they can
+    be interpolated into hand-built SQL.
+    """
+    return engine.dialect.identifier_preparer.quote(identifier)
+
+def _validate_column(column):
+    """Reject identifiers that are not columns of the current table"""
+    global _allowed_columns
+    if _allowed_columns is None:
+        # Fail closed: a process that didn't create the table (e.g. a
+        # second uvicorn worker) learns the columns from the catalog
+        # instead of waving every identifier through
+        _allowed_columns = {
+            col['name'] for col in inspect(engine).get_columns(TABLE_NAME)
+        }
+    if column not in _allowed_columns:
+        raise ValueError(f"Unknown column: {column}")
+
+@functools.lru_cache(maxsize=128)
+def _update_statement(columns):
+    """Build (and cache) the UPDATE statement for a given column tuple"""
+    set_clause = ", ".join([f"{key} = :{key}" for key in columns])
+    return text(f"UPDATE {TABLE_NAME} SET {set_clause} WHERE id = :id RETURNING id")
+
+# Short-lived cache for get_record_by_id: the duplicated existence check on
+# PUT/DELETE and repeated reads of hot ids skip the database entirely
+_record_cache = TTLCache(maxsize=10_000, ttl=30)
+_record_cache_lock = threading.Lock()
+
+# Hot statements are built once at import so SQLAlchemy reuses the same
+# compiled form (and the driver the same server-side plan) on every call
+SELECT_ALL_STMT = text(f"SELECT * FROM {TABLE_NAME}")
+SELECT_BY_ID_STMT = text(f"SELECT * FROM {TABLE_NAME} WHERE id = :id")
+DELETE_BY_ID_STMT = text(f"DELETE FROM {TABLE_NAME} WHERE id = :id RETURNING id")
+
+def _table_ready():
+    """Check (and cache) whether the data table exists"""
+    global _table_exists
+    if _table_exists is None:
+        _table_exists = inspect(engine).has_table(TABLE_NAME)
+    return _table_exists
+
 def get_db_connection():
     """Get database session"""
     return SessionLocal()
 
 def initialize_db():
     """Initialize the database and drop/recreate the table if needed"""
+    global _table_exists, _allowed_columns, _current_table
     try:
         # Test connection
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
 
         with engine.begin() as conn:
-            conn.execute(text("DROP TABLE IF EXISTS uploaded_data"))
+            if engine.dialect.name == "postgresql":
+                # CASCADE removes any materialized count views left behind
+                conn.execute(text("DROP TABLE IF EXISTS uploaded_data CASCADE"))
+            else:
+                conn.execute(text("DROP TABLE IF EXISTS uploaded_data"))
+        _table_exists = False
+        _mat_views.clear()
+        _allowed_columns = None
+        _current_table = None
 
         print("Database connection successful")
 
@@ -43,38 +139,252 @@ def initialize_db():
         print(f"Database connection failed: {e}")
         raise
 
-def create_table_from_df(df):
-    """Create table based on DataFrame structure using SQLAlchemy only"""
+def create_materialized_view(column):
+    """Create (or rebuild) the materialized count view for a column"""
+    view_name = f"mv_count_{column}"
+    # Both the column and the name derived from it need quoting: a valid
+    # column like "order" or "first name" is not a bare identifier
+    quoted_view = _quote(view_name)
+    quoted_col = _quote(column)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {quoted_view}"))
+        conn.execute(text(
+            f"CREATE MATERIALIZED VIEW {quoted_view} AS "
+            f"SELECT {quoted_col}, COUNT(*) AS count FROM {TABLE_NAME} GROUP BY {quoted_col}"
+        ))
+    _mat_views.add(column)
+    return view_name
+
+def fetch_column_counts(column):
+    """Fetch value counts for a column, precomputed in a materialized view on PostgreSQL"""
+    try:
+        # Check if table exists first (cached after the first catalog lookup)
+        if not _table_ready():
+            print(f"Table {TABLE_NAME} does not exist yet")
+            return []
+
+        _validate_column(column)
+
+        if engine.dialect.name == "postgresql":
+            # Repeat aggregate queries become a scan over the precomputed view
+            if column not in _mat_views:
+                create_materialized_view(column)
+            query = text(f'SELECT * FROM {_quote(f"mv_count_{column}")}')
+        else:
+            quoted_col = _quote(column)
+            query = text(f"SELECT {quoted_col}, COUNT(*) AS count FROM {TABLE_NAME} GROUP BY {quoted_col}")
+
+        with engine.connect() as conn:
+            result = conn.execute(query)
+            return [dict(row) for row in result.mappings()]
+    except ValueError:
+        raise
+    except Exception as e:
+        print(f"Error fetching column counts: {e}")
+        return []
+
+def _column_type_for(dtype):
+    """Map a pandas dtype to the matching SQLAlchemy column type"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return Boolean
+    if pd.api.types.is_integer_dtype(dtype):
+        return BigInteger
+    if pd.api.types.is_float_dtype(dtype):
+        return Float(53)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DateTime
+    return Text
+
+def _matches_type(reflected, expected):
+    """Check a reflected column type against the type we would create"""
+    expected_cls = expected if isinstance(expected, type) else type(expected)
+    return isinstance(reflected, expected_cls)
+
+def create_table_from_df(df, infer_types=True):
+    """Create table based on DataFrame structure and return the Table object
+
+    infer_types=False forces Text for every CSV column; callers that only
+    see part of the file (streamed multi-chunk uploads) use it so a later
+    chunk cannot contradict types inferred from the first.
+    """
+    global _table_exists, _allowed_columns, _current_table
+    _allowed_columns = {'id', *df.columns}
     metadata = MetaData()
     columns = [Column('id', Integer, primary_key=True, autoincrement=True)]
 
+    # Typed columns keep numbers/dates in their native representation instead
+    # of text, which shrinks storage and makes filtered scans cheaper
     for col_name in df.columns:
-        columns.append(Column(col_name, String))
+        col_type = _column_type_for(df[col_name].dtype) if infer_types else Text
+        columns.append(Column(col_name, col_type))
 
     table = Table(TABLE_NAME, metadata, *columns)
+    _current_table = table
+
+    # Same-shape re-uploads keep the table and its indexes: TRUNCATE skips
+    # the schema-catalog churn and index rebuilds of a full DROP/CREATE
+    try:
+        inspector = inspect(engine)
+        if inspector.has_table(TABLE_NAME):
+            existing_cols = inspector.get_columns(TABLE_NAME)
+            existing = [col['name'] for col in existing_cols]
+            if existing == ['id'] + list(df.columns):
+                # Reuse demands matching types in both directions: a typed
+                # table cannot take a Text-only streamed upload, and a
+                # column whose inferred type drifted (int -> text) would
+                # reject the new values — either case falls through to a
+                # full drop/create
+                expected = {
+                    name: _column_type_for(df[name].dtype) if infer_types else Text
+                    for name in df.columns
+                }
+                types_ok = all(
+                    _matches_type(col['type'], expected[col['name']])
+                    for col in existing_cols if col['name'] != 'id'
+                )
+                if types_ok:
+                    with engine.begin() as conn:
+                        if engine.dialect.name == "postgresql":
+                            conn.execute(text(f"TRUNCATE TABLE {TABLE_NAME} RESTART IDENTITY"))
+                        else:
+                            conn.execute(text(f"DELETE FROM {TABLE_NAME}"))
+                    _table_exists = True
+                    print(f"Truncated table {TABLE_NAME}; schema unchanged")
+                    return table
+    except Exception as e:
+        # Fall through to the drop/create path on any reflection failure
+        print(f"Schema comparison failed, recreating table: {e}")
+
+    # Materialized count views depend on the table and must go first
+    if _mat_views:
+        with engine.begin() as conn:
+            for view_col in _mat_views:
+                conn.execute(text(f'DROP MATERIALIZED VIEW IF EXISTS {_quote(f"mv_count_{view_col}")}'))
+        _mat_views.clear()
 
     # Drop and recreate table
     metadata.drop_all(bind=engine, tables=[table])
     metadata.create_all(bind=engine, tables=[table])
-    
+    _table_exists = True
+
+    # The table is transient (dropped on startup, replaced per upload), so
+    # skip WAL generation during bulk loads; not crash-safe, by design
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {TABLE_NAME} SET UNLOGGED"))
+
+    # Index the filter columns so /records/?column=X&value=Y runs an index
+    # scan instead of a full sequential scan as uploads grow
+    index_cols = [c for c in (INDEX_COLUMNS or df.columns) if c in df.columns]
+    if index_cols:
+        # CSV headers are arbitrary ("first name", "order"), so quote both
+        # the index name and the column through the dialect's preparer
+        preparer = engine.dialect.identifier_preparer
+        with engine.begin() as conn:
+            for col in index_cols:
+                conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS {preparer.quote(f"idx_{col}")} '
+                    f'ON {TABLE_NAME} ({preparer.quote(col)})'
+                ))
+
     print(f"Created table {TABLE_NAME} with columns: id, {', '.join(df.columns)}")
+    # Hand the constructed Table back so callers never re-reflect it
+    return table
+
+def _copy_from_dataframe(df):
+    """Bulk load a DataFrame into the table using the PostgreSQL COPY protocol"""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+
+    # COPY needs the raw DBAPI cursor; running it on the pooled connection
+    # inside engine.begin() keeps the load in one managed transaction and
+    # avoids checking out a second connection just for the bulk path.
+    # id is auto-increment so it stays out of the column list.
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {TABLE_NAME} ({','.join(_quote(c) for c in df.columns)}) "
+            f"FROM STDIN WITH (FORMAT CSV)",
+            buf
+        )
 
-def insert_csv_data(df):
-    """Insert CSV data into PostgreSQL table"""
+def _execute_values_insert(df):
+    """Bulk insert via psycopg2 execute_values: one multi-VALUES statement per page"""
+    from psycopg2.extras import execute_values
+
+    raw_conn = engine.raw_connection()
     try:
-        # Ensure table exists and has 'id' primary key
-        create_table_from_df(df)
-
-        # Insert data using SQLAlchemy directly to ensure id column is handled properly
-        metadata = MetaData()
-        table = Table(TABLE_NAME, metadata, autoload_with=engine)
-        
-        # Convert DataFrame to list of dictionaries (excluding id since it's auto-increment)
-        records_to_insert = df.to_dict('records')
-        
-        with engine.begin() as conn:
-            conn.execute(table.insert(), records_to_insert)
-        
+        cursor = raw_conn.cursor()
+        # itertuples yields plain C tuples, avoiding per-row dict allocation
+        execute_values(
+            cursor,
+            f"INSERT INTO {TABLE_NAME} ({','.join(_quote(c) for c in df.columns)}) VALUES %s",
+            df.itertuples(index=False, name=None),
+            page_size=1000
+        )
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
+
+def _batched_insert(df):
+    """Insert rows through SQLAlchemy's insertmanyvalues fast path
+
+    Rows are fed lazily from itertuples and executed in INSERT_CHUNKSIZE
+    batches inside one transaction, so memory stays bounded and each batch
+    becomes a paged multi-VALUES statement rather than per-row INSERTs.
+    """
+    global _current_table
+    table = _current_table
+    if table is None:
+        # Reflect once and keep the Table cached for subsequent batches
+        table = Table(TABLE_NAME, MetaData(), autoload_with=engine)
+        _current_table = table
+
+    cols = list(df.columns)
+    rows = (dict(zip(cols, values)) for values in df.itertuples(index=False, name=None))
+    with engine.begin() as conn:
+        while True:
+            batch = list(islice(rows, INSERT_CHUNKSIZE))
+            if not batch:
+                break
+            conn.execute(table.insert(), batch)
+
+def insert_csv_data(df, recreate=True, infer_types=True):
+    """Insert CSV data into PostgreSQL table
+
+    With recreate=False the rows are appended to the existing table, which
+    lets callers stream a large CSV in chunks; infer_types is passed
+    through to create_table_from_df.
+    """
+    try:
+        if recreate:
+            # Ensure table exists and has 'id' primary key; the table is
+            # recreated so every cached record is stale
+            create_table_from_df(df, infer_types=infer_types)
+            with _record_cache_lock:
+                _record_cache.clear()
+
+        if df.empty:
+            # Nothing to load — skip the buffer and connection work entirely
+            pass
+        elif engine.dialect.name == "postgresql":
+            # COPY streams the whole DataFrame in one bulk protocol load
+            # instead of one parameterized INSERT per row; execute_values is
+            # the SQL-level alternative for setups where COPY is not wanted
+            if PG_BULK_METHOD == "values":
+                _execute_values_insert(df)
+            else:
+                _copy_from_dataframe(df)
+        else:
+            _batched_insert(df)
+
+        # Any surviving materialized count views now reflect stale data
+        if _mat_views and engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                for view_col in list(_mat_views):
+                    conn.execute(text(f'REFRESH MATERIALIZED VIEW {_quote(f"mv_count_{view_col}")}'))
+
         print(f"Inserted {len(df)} records into {TABLE_NAME}")
     except Exception as e:
         print(f"Error inserting data: {e}")
@@ -83,27 +393,24 @@ def insert_csv_data(df):
 def fetch_records(column=None, value=None):
     """Fetch records from the database with optional filtering"""
     try:
-        # Check if table exists first
-        inspector = inspect(engine)
-        if not inspector.has_table(TABLE_NAME):
+        # Check if table exists first (cached after the first catalog lookup)
+        if not _table_ready():
             print(f"Table {TABLE_NAME} does not exist yet")
             return []
-        
+
         with engine.connect() as conn:
             if column and value:
+                _validate_column(column)
                 query = text(f"SELECT * FROM {TABLE_NAME} WHERE {column} = :value")
                 result = conn.execute(query, {'value': value})
             else:
-                query = text(f"SELECT * FROM {TABLE_NAME}")
-                result = conn.execute(query)
-            
-            # Convert result to list of dictionaries
-            columns = result.keys()
-            records = []
-            for row in result:
-                records.append(dict(zip(columns, row)))
-            
-            return records
+                result = conn.execute(SELECT_ALL_STMT)
+
+            # RowMapping views come straight from the driver, skipping the
+            # per-row dict(zip(...)) pass in Python
+            return [dict(row) for row in result.mappings()]
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error fetching records: {e}")
         return []
@@ -111,36 +418,72 @@ def fetch_records(column=None, value=None):
 def update_record(record_id, updates):
     """Update a specific record"""
     try:
-        # Check if table exists first
-        inspector = inspect(engine)
-        if not inspector.has_table(TABLE_NAME):
+        # Check if table exists first (cached after the first catalog lookup)
+        if not _table_ready():
             print(f"Table {TABLE_NAME} does not exist yet")
             return False
-        
-        set_clause = ", ".join([f"{key} = :{key}" for key in updates.keys()])
-        query = text(f"UPDATE {TABLE_NAME} SET {set_clause} WHERE id = :id")
-        
+
+        for key in updates:
+            _validate_column(key)
+        query = _update_statement(tuple(sorted(updates.keys())))
+
+        # RETURNING reports whether the row existed in the same round-trip,
+        # so callers no longer need a separate existence check
         with engine.begin() as conn:
             result = conn.execute(query, {**updates, 'id': record_id})
-            return result.rowcount > 0
+            with _record_cache_lock:
+                _record_cache.pop(record_id, None)
+            return result.fetchone() is not None
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error updating record: {e}")
         return False
 
+def update_records(record_updates):
+    """Update many records inside a single transaction
+
+    record_updates is a list of (record_id, updates) pairs; returns the
+    number of records actually updated.
+    """
+    try:
+        # Check if table exists first (cached after the first catalog lookup)
+        if not _table_ready():
+            print(f"Table {TABLE_NAME} does not exist yet")
+            return 0
+
+        updated = 0
+        # One BEGIN/COMMIT pair for the whole batch instead of one per row
+        with engine.begin() as conn:
+            for record_id, updates in record_updates:
+                for key in updates:
+                    _validate_column(key)
+                query = _update_statement(tuple(sorted(updates.keys())))
+                result = conn.execute(query, {**updates, 'id': record_id})
+                if result.fetchone() is not None:
+                    updated += 1
+                with _record_cache_lock:
+                    _record_cache.pop(record_id, None)
+        return updated
+    except ValueError:
+        raise
+    except Exception as e:
+        print(f"Error updating records: {e}")
+        return 0
+
 def delete_record(record_id):
     """Delete a specific record"""
     try:
-        # Check if table exists first
-        inspector = inspect(engine)
-        if not inspector.has_table(TABLE_NAME):
+        # Check if table exists first (cached after the first catalog lookup)
+        if not _table_ready():
             print(f"Table {TABLE_NAME} does not exist yet")
             return False
-        
-        query = text(f"DELETE FROM {TABLE_NAME} WHERE id = :id")
-        
+
         with engine.begin() as conn:
-            result = conn.execute(query, {'id': record_id})
-            return result.rowcount > 0
+            result = conn.execute(DELETE_BY_ID_STMT, {'id': record_id})
+            with _record_cache_lock:
+                _record_cache.pop(record_id, None)
+            return result.fetchone() is not None
     except Exception as e:
         print(f"Error deleting record: {e}")
         return False
@@ -148,24 +491,27 @@ def delete_record(record_id):
 def get_record_by_id(record_id):
     """Get a specific record by ID"""
     try:
-        # Check if table exists first
-        inspector = inspect(engine)
-        if not inspector.has_table(TABLE_NAME):
+        with _record_cache_lock:
+            if record_id in _record_cache:
+                return _record_cache[record_id]
+
+        # Check if table exists first (cached after the first catalog lookup)
+        if not _table_ready():
             print(f"Table {TABLE_NAME} does not exist yet")
             return None
-        
+
         with engine.connect() as conn:
-            query = text(f"SELECT * FROM {TABLE_NAME} WHERE id = :id")
-            result = conn.execute(query, {'id': record_id})
-            
-            # Get the first row
-            row = result.fetchone()
+            result = conn.execute(SELECT_BY_ID_STMT, {'id': record_id})
+
+            # Get the first row as a mapping (None when not found)
+            row = result.mappings().first()
             if row is None:
                 return None
-            
-            # Convert to dict
-            columns = result.keys()
-            return dict(zip(columns, row))
+
+            record = dict(row)
+            with _record_cache_lock:
+                _record_cache[record_id] = record
+            return record
             
     except Exception as e:
         print(f"Error fetching record: {e}")
@@ -1,9 +1,9 @@
 #main.py
 from fastapi import FastAPI, UploadFile, File, Query, HTTPException, Path
 from contextlib import asynccontextmanager
-from database import initialize_db, insert_csv_data, fetch_records, update_record, delete_record, get_record_by_id
-from utils import process_csv
-from typing import Dict, Any
+from database import initialize_db, insert_csv_data, fetch_records, update_record, update_records, delete_record, get_record_by_id, fetch_column_counts
+from utils import iter_csv_chunks
+from typing import Dict, Any, List
 import uvicorn
 from database import engine
 
@@ -21,27 +21,48 @@ app = FastAPI(
 )
 
 @app.post("/upload/", summary="Upload CSV file")
-async def upload_csv(file: UploadFile = File(...)):
+def upload_csv(file: UploadFile = File(...)):
     """Upload and store CSV data in PostgreSQL"""
     try:
-        content = await file.read()
-        df = process_csv(content)
-        insert_csv_data(df)
-        return {"message": f"CSV uploaded successfully. {len(df)} records stored."}
+        # Stream the spooled upload file in chunks so memory stays bounded
+        # regardless of CSV size; the first chunk recreates the table.
+        # Column types are only inferred when the whole file fits in one
+        # chunk — a later chunk could contradict types guessed from the
+        # first, so multi-chunk uploads get Text columns
+        total = 0
+        chunks = iter_csv_chunks(file.file)
+        first = next(chunks, None)
+        if first is not None:
+            second = next(chunks, None)
+            insert_csv_data(first, recreate=True, infer_types=second is None)
+            total += len(first)
+            if second is not None:
+                insert_csv_data(second, recreate=False)
+                total += len(second)
+                for chunk in chunks:
+                    insert_csv_data(chunk, recreate=False)
+                    total += len(chunk)
+        return {"message": f"CSV uploaded successfully. {total} records stored."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/records/", summary="Get all records")
-async def get_records(column: str = Query(None), value: str = Query(None)):
-    """Fetch records with optional filtering"""
+def get_records(column: str = Query(None), value: str = Query(None), agg: str = Query(None)):
+    """Fetch records with optional filtering or aggregation"""
     try:
+        if agg == "count" and column:
+            counts = fetch_column_counts(column)
+            return {"counts": counts, "count": len(counts)}
+
         records = fetch_records(column, value)
         return {"records": records, "count": len(records)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/records/{record_id}", summary="Get record by ID")
-async def get_record(record_id: int = Path(..., description="Record ID")):
+def get_record(record_id: int = Path(..., description="Record ID")):
     """Get a specific record by ID"""
     try:
         record = get_record_by_id(record_id)
@@ -54,7 +75,7 @@ async def get_record(record_id: int = Path(..., description="Record ID")):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/records/{record_id}", summary="Update record")
-async def update_record_endpoint(
+def update_record_endpoint(
     record_id: int = Path(..., description="Record ID"),
     updates: Dict[str, Any] = None
 ):
@@ -62,36 +83,52 @@ async def update_record_endpoint(
     try:
         if not updates:
             raise HTTPException(status_code=400, detail="No updates provided")
-        
-        # Check if record exists
-        existing_record = get_record_by_id(record_id)
-        if not existing_record:
-            raise HTTPException(status_code=404, detail="Record not found")
-        
+
+        # UPDATE ... RETURNING reports a missing record in the same round-trip
         success = update_record(record_id, updates)
         if success:
             return {"message": "Record updated successfully"}
         else:
-            raise HTTPException(status_code=500, detail="Failed to update record")
+            raise HTTPException(status_code=404, detail="Record not found")
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/records/bulk_update", summary="Update multiple records")
+def bulk_update_endpoint(items: List[Dict[str, Any]]):
+    """Update several records in a single transaction"""
+    try:
+        if not items:
+            raise HTTPException(status_code=400, detail="No updates provided")
+
+        record_updates = []
+        for item in items:
+            if "id" not in item or not item.get("updates"):
+                raise HTTPException(status_code=400, detail="Each item needs an id and updates")
+            record_updates.append((item["id"], item["updates"]))
+
+        updated = update_records(record_updates)
+        return {"message": f"{updated} records updated successfully", "updated": updated}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/records/{record_id}", summary="Delete record")
-async def delete_record_endpoint(record_id: int = Path(..., description="Record ID")):  
+def delete_record_endpoint(record_id: int = Path(..., description="Record ID")):
     """Delete a specific record"""
     try:
-        # Check if record exists
-        existing_record = get_record_by_id(record_id)
-        if not existing_record:
-            raise HTTPException(status_code=404, detail="Record not found")
-        
+        # DELETE ... RETURNING reports a missing record in the same round-trip
         success = delete_record(record_id)
         if success:
             return {"message": "Record deleted successfully"}
         else:
-            raise HTTPException(status_code=500, detail="Failed to delete record")
+            raise HTTPException(status_code=404, detail="Record not found")
     except HTTPException:
         raise
     except Exception as e:
@@ -103,7 +140,7 @@ async def health_check():
     return {"status": "healthy", "database": "postgresql"}
 
 @app.get("/debug/columns")
-async def get_columns():
+def get_columns():
     from sqlalchemy import inspect
     inspector = inspect(engine)
     columns = inspector.get_columns("uploaded_data")
@@ -1,148 +1,154 @@
-import subprocess
-import sys
-import os
-import time
-import platform
-
-def run_command(command, description):
-    """Run a shell command and return success status"""
-    print(f"\n{'='*50}")
-    print(f"Running: {description}")
-    print(f"Command: {command}")
-    print(f"{'='*50}")
-    
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print(" SUCCESS")
-        if result.stdout:
-            print("Output:", result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(" FAILED")
-        print("Error:", e.stderr)
-        if e.stdout:
-            print("Output:", e.stdout)
-        return False
-
-def test_docker_container():
-    """Test Docker container with proper cleanup"""
-    container_name = "test_container_sample"
-    
-    print(f"\n{'='*50}")
-    print("Running: Docker Container Test")
-    print(f"{'='*50}")
-    
-    try:
-        # Clean up any existing container (PowerShell compatible)
-        if platform.system() == "Windows":
-            subprocess.run(f"docker stop {container_name}", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            subprocess.run(f"docker rm {container_name}", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        else:
-            subprocess.run(f"docker stop {container_name} 2>/dev/null", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            subprocess.run(f"docker rm {container_name} 2>/dev/null", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        
-        # Start container - Use port 8000 to match main.py
-        print("Starting container...")
-        result = subprocess.run(
-            f"docker run -d -p 8000:8000 --name {container_name} fastapi_app",
-            shell=True, check=True, capture_output=True, text=True
-        )
-        print("Container started successfully")
-        
-        # Wait longer for application to start
-        print("Waiting for application to start...")
-        time.sleep(15)  # Increased wait time
-        
-        # Test the health endpoint - Use port 8000
-        print("Testing health endpoint...")
-        
-        # Try multiple times with increasing delays
-        for attempt in range(3):
-            try:
-                if platform.system() == "Windows":
-                    curl_cmd = 'curl -f -m 10 http://localhost:8000/health'
-                else:
-                    curl_cmd = 'curl -f -m 10 http://localhost:8000/health'
-                    
-                test_result = subprocess.run(
-                    curl_cmd, shell=True, check=True, capture_output=True, text=True
-                )
-                
-                print(" Container test SUCCESS")
-                print("Response:", test_result.stdout)
-                return True
-                
-            except subprocess.CalledProcessError as e:
-                if attempt < 2:  # Not the last attempt
-                    print(f"Attempt {attempt + 1} failed, retrying in 5 seconds...")
-                    time.sleep(5)
-                else:
-                    print(" Container test FAILED")
-                    print("Error:", e.stderr if e.stderr else "No error output")
-                    if e.stdout:
-                        print("Output:", e.stdout)
-                    
-                    # Additional debugging
-                    print("Checking container logs...")
-                    logs_result = subprocess.run(
-                        f"docker logs {container_name}", 
-                        shell=True, capture_output=True, text=True
-                    )
-                    if logs_result.stdout:
-                        print("Container logs:", logs_result.stdout[-500:])  # Last 500 chars
-                    
-                    return False
-        
-    except subprocess.CalledProcessError as e:
-        print(" Container test FAILED")
-        print("Error:", e.stderr)
-        if e.stdout:
-            print("Output:", e.stdout)
-        return False
-    finally:
-        # Always clean up (PowerShell compatible)
-        print("Cleaning up container...")
-        if platform.system() == "Windows":
-            subprocess.run(f"docker stop {container_name}", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            subprocess.run(f"docker rm {container_name}", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        else:
-            subprocess.run(f"docker stop {container_name} 2>/dev/null", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            subprocess.run(f"docker rm {container_name} 2>/dev/null", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-def main():
-    """Main execution function"""
-    print(" Starting Test and Build Pipeline")
-    
-    # Step 1: Run unit tests
-    test_success = run_command("python test_main.py", "Unit Tests")
-    
-    if not test_success:
-        print("\n Unit tests failed. Docker build will NOT be triggered.")
-        sys.exit(1)
-    
-    print("\n All unit tests passed! Proceeding with Docker build...")
-    
-    # Step 2: Build Docker image (only if tests pass)
-    build_success = run_command("docker build -t fastapi_app .", "Docker Build")
-    
-    if not build_success:
-        print("\n Docker build failed.")
-        sys.exit(1)
-    
-    # Step 3: Test Docker container
-    test_container_success = test_docker_container()
-    
-    if test_container_success:
-        print("\n All tests passed and Docker image built successfully!")
-        print(" Pipeline completed successfully")
-    else:
-        print("\n Docker container test failed, but image was built successfully")
-        print(" Core pipeline completed")
-    
-    print("\n Summary:")
-    print(f"  Unit Tests: {' PASSED' if test_success else ' FAILED'}")
-    print(f"  Docker Build: {' PASSED' if build_success else ' FAILED'}")
-    print(f"  Container Test: {' PASSED' if test_container_success else '  WARNING'}")
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+from urllib.error import URLError
+
+import docker
+
+def run_command(command, description):
+    """Run a command (argv list) and return success status"""
+    print(f"\n{'='*50}")
+    print(f"Running: {description}")
+    print(f"Command: {' '.join(command)}")
+    print(f"{'='*50}")
+
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        print(" SUCCESS")
+        if result.stdout:
+            print("Output:", result.stdout)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(" FAILED")
+        print("Error:", e.stderr)
+        if e.stdout:
+            print("Output:", e.stdout)
+        return False
+
+def build_image(client):
+    """Build the application image using the shared Docker client"""
+    print(f"\n{'='*50}")
+    print("Running: Docker Build")
+    print(f"{'='*50}")
+
+    try:
+        client.images.build(path=".", tag="fastapi_app")
+        print(" SUCCESS")
+        return True
+    except docker.errors.DockerException as e:
+        print(" FAILED")
+        print("Error:", e)
+        return False
+
+def wait_for_health(timeout=15.0, interval=0.2):
+    """Poll the health endpoint until it responds or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urlopen("http://localhost:8000/health", timeout=2) as response:
+                if response.status == 200:
+                    return response.read().decode()
+        except (URLError, OSError):
+            pass
+        time.sleep(interval)
+    return None
+
+def test_docker_container(client):
+    """Test Docker container with proper cleanup"""
+    container_name = "test_container_sample"
+
+    print(f"\n{'='*50}")
+    print("Running: Docker Container Test")
+    print(f"{'='*50}")
+
+    container = None
+    try:
+        # Clean up any leftover container from a previous run
+        try:
+            client.containers.get(container_name).remove(force=True)
+        except docker.errors.NotFound:
+            pass
+
+        # Start container - Use port 8000 to match main.py
+        print("Starting container...")
+        container = client.containers.run(
+            "fastapi_app",
+            detach=True,
+            name=container_name,
+            ports={'8000/tcp': 8000}
+        )
+        print("Container started successfully")
+
+        # Poll the health endpoint instead of sleeping a worst-case guess;
+        # typical startup is a couple of seconds, ceiling stays at 15
+        print("Waiting for application to start...")
+        response = wait_for_health()
+        if response is not None:
+            print(" Container test SUCCESS")
+            print("Response:", response)
+            return True
+
+        print(" Container test FAILED")
+        print("Checking container logs...")
+        logs = container.logs().decode(errors="replace")
+        if logs:
+            print("Container logs:", logs[-500:])  # Last 500 chars
+        return False
+
+    except docker.errors.DockerException as e:
+        print(" Container test FAILED")
+        print("Error:", e)
+        return False
+    finally:
+        # Always clean up
+        print("Cleaning up container...")
+        if container is not None:
+            try:
+                container.remove(force=True)
+            except docker.errors.DockerException:
+                pass
+
+def main():
+    """Main execution function"""
+    print(" Starting Test and Build Pipeline")
+
+    # One persistent client for every Docker call in the pipeline
+    client = docker.from_env()
+
+    # Steps 1+2: unit tests and the Docker build share no state and the
+    # build dominates wall time, so run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        test_future = executor.submit(run_command, [sys.executable, "test_main.py"], "Unit Tests")
+        build_future = executor.submit(build_image, client)
+        test_success = test_future.result()
+        build_success = build_future.result()
+
+    if not test_success:
+        print("\n Unit tests failed. Docker image will NOT be used.")
+        sys.exit(1)
+
+    if not build_success:
+        print("\n Docker build failed.")
+        sys.exit(1)
+
+    print("\n All unit tests passed and Docker image built!")
+
+    # Step 3: Test Docker container
+    test_container_success = test_docker_container(client)
+
+    if test_container_success:
+        print("\n All tests passed and Docker image built successfully!")
+        print(" Pipeline completed successfully")
+    else:
+        print("\n Docker container test failed, but image was built successfully")
+        print(" Core pipeline completed")
+
+    print("\n Summary:")
+    print(f"  Unit Tests: {' PASSED' if test_success else ' FAILED'}")
+    print(f"  Docker Build: {' PASSED' if build_success else ' FAILED'}")
+    print(f"  Container Test: {' PASSED' if test_container_success else '  WARNING'}")
+
+if __name__ == "__main__":
+    main()